@@ -1,7 +1,25 @@
 import tkinter as tk
 from tkinter import messagebox, ttk
 import time
-from game_logic  import PenteGame, BOARD_SIZE, WHITE, BLACK, EMPTY
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+try:
+    from PIL import Image, ImageDraw, ImageTk
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+try:
+    import pandas as pd
+    PANDAS_AVAILABLE = True
+except ImportError:
+    PANDAS_AVAILABLE = False
+
+from game_logic  import PenteGame, BOARD_SIZE, WHITE, BLACK, EMPTY, OPPONENT
 from ai_engine   import PenteAI
 from analysis_experiments import run_experiments, run_aggregated
 import os
@@ -17,11 +35,40 @@ class PenteGUI:
         self.margin = 20
         
         self.game = PenteGame()
-        self.ai_players = {} 
+        self.ai_players = {}
         self.game_over = False
-        
+
+        # AI runs on a worker thread so the Tk main loop stays responsive
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._ai_busy = False
+        self._pending_ai = None  # (future, player, start_time, generation)
+        # Bumped on every game reset so results from searches started
+        # against a previous game are dropped instead of applied
+        self._ai_generation = 0
+
+        # Precomputed pixel coordinates (square board, so x and y share a table)
+        self._xs = [self.margin + i * self.cell_size for i in range(self.board_size)]
+        self._ys = self._xs
+        self._stone_bboxes = [(x - 12, y - 12, x + 12, y + 12)
+                              for y in self._ys for x in self._xs]
+
+        # Reused AI instances keyed by (mode, color, depth) so warm caches
+        # survive across games
+        self._ai_cache = {}
+
+        # Cached path of the newest aggregated results CSV
+        self._last_agg_path = None
+
+        # Coalesced label updates: one Tk relayout per event-loop tick
+        self._pending_labels = {}
+        self._flush_pending = False
+
+        # Incremental stone rendering state
+        self._stone_items = {}  # (r, c) -> canvas item id
+        self._last_grid = np.zeros((self.board_size, self.board_size), dtype=np.int8)
+
         self._create_widgets()
-        self._draw_board()
+        self._redraw_stones()
 
     def _create_widgets(self):
         # Control Panel
@@ -51,14 +98,32 @@ class PenteGUI:
         tk.Label(control_frame, text="Depth:").grid(row=2, column=0, padx=5)
         self.depth_var = tk.IntVar(value=2)
         tk.Spinbox(control_frame, from_=1, to=3, textvariable=self.depth_var, width=5).grid(row=2, column=1, sticky="w")
+
+        # Per-move time budget for iterative deepening
+        tk.Label(control_frame, text="Time budget (s):").grid(row=3, column=0, padx=5)
+        self.time_var = tk.DoubleVar(value=5.0)
+        tk.Spinbox(control_frame, from_=0.5, to=30.0, increment=0.5, textvariable=self.time_var, width=5).grid(row=3, column=1, sticky="w")
         
         # AI vs AI Checkbox
         self.ai_vs_ai_var = tk.BooleanVar(value=False)
         tk.Checkbutton(control_frame, text="AI vs AI", variable=self.ai_vs_ai_var).grid(row=2, column=3, padx=10)
 
+        # Keep transposition table between games (off = fresh cache per game)
+        self.keep_tt_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(control_frame, text="Keep AI cache", variable=self.keep_tt_var).grid(row=0, column=3, padx=10)
+
+        # Move ordering (TT/threat/centrality sort before alpha-beta expansion)
+        self.ordering_var = tk.BooleanVar(value=True)
+        tk.Checkbutton(control_frame, text="Move ordering", variable=self.ordering_var).grid(row=1, column=3, padx=10)
+
+        # Proximity search (only consider cells near existing stones)
+        self.proximity_var = tk.BooleanVar(value=True)
+        tk.Checkbutton(control_frame, text="Proximity search", variable=self.proximity_var).grid(row=1, column=4, padx=10)
+
         # Buttons
         tk.Button(control_frame, text="New Game", command=self.start_game, bg="#4CAF50", fg="white").grid(row=2, column=2, padx=10)
-        tk.Button(control_frame, text="Run & Compare (Quick)", command=self.run_and_show_comparison, bg="#2196F3", fg="white").grid(row=2, column=4, padx=10)
+        self.compare_btn = tk.Button(control_frame, text="Run & Compare (Quick)", command=self.run_and_show_comparison, bg="#2196F3", fg="white")
+        self.compare_btn.grid(row=2, column=4, padx=10)
         
         # Stats
         self.status_label = tk.Label(self.root, text="Select Mode and Start Game", font=("Arial", 12, "bold"))
@@ -75,30 +140,77 @@ class PenteGUI:
         self.canvas = tk.Canvas(self.root, width=canvas_len, height=canvas_len, bg="#DEB887")
         self.canvas.pack()
         self.canvas.bind("<Button-1>", self.on_click)
+        self._draw_background()
+
+    def _reset_canvas_stones(self):
+        for item in self._stone_items.values():
+            self.canvas.delete(item)
+        self._stone_items.clear()
+        self.canvas.delete("highlight")
+        self._last_grid = np.zeros((self.board_size, self.board_size), dtype=np.int8)
+
+    def _draw_background(self):
+        # Grid and star points never change, so render them once under the
+        # "bg" tag: as a single pre-rendered bitmap when Pillow is available
+        # (one canvas item instead of ~40), else as cached line items.
+        stars = [3, 9, 15]
+        if PIL_AVAILABLE:
+            canvas_len = self.margin * 2 + (self.board_size - 1) * self.cell_size
+            img = Image.new("RGB", (canvas_len, canvas_len), "#DEB887")
+            draw = ImageDraw.Draw(img)
+            end = self._xs[-1]
+            for i in range(self.board_size):
+                pos = self._xs[i]
+                draw.line([(self.margin, pos), (end, pos)], fill="black")
+                draw.line([(pos, self.margin), (pos, end)], fill="black")
+            for r in stars:
+                for c in stars:
+                    x, y = self._xs[c], self._ys[r]
+                    draw.ellipse([x-3, y-3, x+3, y+3], fill="black")
+            self._bg_img = ImageTk.PhotoImage(img)  # keep a reference or Tk drops it
+            self.canvas.create_image(0, 0, image=self._bg_img, anchor='nw', tags="bg")
+            return
+
+        for i in range(self.board_size):
+            start = self.margin + i * self.cell_size
+            end = self.margin + (self.board_size - 1) * self.cell_size
+            self.canvas.create_line(self.margin, start, end, start, tags="bg")
+            self.canvas.create_line(start, self.margin, start, end, tags="bg")
+
+        for r in stars:
+            for c in stars:
+                x, y = self._xs[c], self._ys[r]
+                self.canvas.create_oval(x-3, y-3, x+3, y+3, fill="black", tags="bg")
 
     def start_game(self):
         self.game = PenteGame()
         self.game_over = False
         self.ai_players = {}
-        
+
+        # Invalidate any search still running against the previous game
+        self._ai_generation += 1
+        self._pending_ai = None
+        self._ai_busy = False
+
+        # Shared transposition table so search state survives between moves
+        if not self.keep_tt_var.get() or not hasattr(self, 'tt'):
+            self.tt = {}
+
+        # First AI construction triggers numba JIT compilation of the
+        # evaluation kernels; tell the user instead of appearing frozen.
+        self.update_status("Compiling AI...")
+        self.root.update()
+
         # Setup Black AI (Standard AI opponent)
-        self.ai_players[BLACK] = PenteAI(
-            mode=self.mode_var.get(), 
-            player_color=BLACK, 
-            depth=self.depth_var.get()
-        )
-        
+        self.ai_players[BLACK] = self._get_or_create_ai(self.mode_var.get(), BLACK, self.depth_var.get())
+
         # Setup White AI (If AI vs AI mode is on)
         if self.ai_vs_ai_var.get():
-            self.ai_players[WHITE] = PenteAI(
-                mode=self.mode_var.get(), 
-                player_color=WHITE, 
-                depth=self.depth_var.get()
-            )
+            self.ai_players[WHITE] = self._get_or_create_ai(self.mode_var.get(), WHITE, self.depth_var.get())
         else:
             self.ai_players[WHITE] = None # Human player
-            
-        self._draw_board()
+
+        self._reset_canvas_stones()
         self.update_captures()
         
         if self.ai_vs_ai_var.get():
@@ -108,50 +220,61 @@ class PenteGUI:
             mode_str = self.mode_var.get().replace('_', ' + ').upper()
             self.update_status(f"Started: {mode_str}. Your Turn (White)")
 
-    def _draw_board(self):
-        self.canvas.delete("all")
-        # Grid
-        for i in range(self.board_size):
-            start = self.margin + i * self.cell_size
-            end = self.margin + (self.board_size - 1) * self.cell_size
-            self.canvas.create_line(self.margin, start, end, start)
-            self.canvas.create_line(start, self.margin, start, end)
-            
-        # Star Points
-        stars = [3, 9, 15]
-        for r in stars:
-            for c in stars:
-                x = self.margin + c * self.cell_size
-                y = self.margin + r * self.cell_size
-                self.canvas.create_oval(x-3, y-3, x+3, y+3, fill="black")
-
-        # Stones
-        for r in range(self.board_size):
-            for c in range(self.board_size):
-                if self.game.grid[r][c] != EMPTY:
-                    self.draw_stone(r, c, self.game.grid[r][c])
-        
-        # Winner
+    def _get_or_create_ai(self, mode, color, depth) -> PenteAI:
+        key = (mode, color, depth)
+        ai = self._ai_cache.get(key)
+        if ai is None:
+            ai = PenteAI(
+                mode=mode,
+                player_color=color,
+                depth=depth,
+                tt=self.tt,
+                time_limit=self.time_var.get(),
+                ordering=self.ordering_var.get(),
+                proximity=self.proximity_var.get()
+            )
+            self._ai_cache[key] = ai
+        else:
+            # Refresh the settings that can change between games
+            ai.tt = self.tt
+            ai.time_limit = self.time_var.get()
+            ai.ordering = self.ordering_var.get()
+            ai.proximity = self.proximity_var.get()
+            ai.reset_stats()
+        return ai
+
+    def _redraw_stones(self):
+        # Only touch cells that changed since the last redraw; the grid
+        # background is cached and never redrawn. The ndarray diff keeps
+        # the per-cell scan out of Python entirely.
+        changed_r, changed_c = np.nonzero(self.game.grid != self._last_grid)
+        for r, c in zip(changed_r.tolist(), changed_c.tolist()):
+            cell = int(self.game.grid[r, c])
+            item = self._stone_items.pop((r, c), None)
+            if item is not None:
+                self.canvas.delete(item)
+            if cell != EMPTY:
+                self._stone_items[(r, c)] = self.draw_stone(r, c, cell)
+            self._last_grid[r, c] = cell
+
+        # Winner highlight (drawn once at game end)
         if self.game.winner:
             for r, c in self.game.winning_sequence:
-                x = self.margin + c * self.cell_size
-                y = self.margin + r * self.cell_size
-                self.canvas.create_oval(x-5, y-5, x+5, y+5, outline="red", width=3)
+                x, y = self._xs[c], self._ys[r]
+                self.canvas.create_oval(x-5, y-5, x+5, y+5, outline="red", width=3, tags="highlight")
 
     def draw_stone(self, r, c, player):
-        x = self.margin + c * self.cell_size
-        y = self.margin + r * self.cell_size
-        rad = 12
         color = "white" if player == WHITE else "black"
         outline = "black" if player == WHITE else "white"
-        self.canvas.create_oval(x-rad, y-rad, x+rad, y+rad, fill=color, outline=outline)
+        return self.canvas.create_oval(*self._stone_bboxes[r * self.board_size + c],
+                                       fill=color, outline=outline)
 
     def on_click(self, event):
-        if self.game_over:
+        if self.game_over or self._ai_busy:
             return
             
         # Determine strict turn
-        current_player = WHITE if self.game.move_count % 2 == 0 else BLACK
+        current_player = self.game.turn
         
         # If it's currently an AI's turn, ignore human clicks
         if self.ai_players.get(current_player):
@@ -162,7 +285,7 @@ class PenteGUI:
         
         if self.game.is_valid_move(r, c, current_player):
             if self.game.make_move(r, c, current_player):
-                self._draw_board()
+                self._redraw_stones()
                 self.update_captures()
                 
                 if self.game.winner:
@@ -170,44 +293,68 @@ class PenteGUI:
                     return
                 
                 # Check if next player is AI
-                next_player = 3 - current_player
+                next_player = OPPONENT[current_player]
                 if self.ai_players.get(next_player):
                     self.update_status(f"AI ({'Black' if next_player == BLACK else 'White'}) Thinking...")
                     self.root.update()
                     self.root.after(50, self.make_ai_move)
 
     def make_ai_move(self):
-        if self.game_over:
+        if self.game_over or self._ai_busy:
             return
 
-        current_player = WHITE if self.game.move_count % 2 == 0 else BLACK
+        current_player = self.game.turn
         ai = self.ai_players.get(current_player)
-        
+
         if not ai:
             return # Should not happen if logic is correct, or waiting for human
-            
-        start = time.time()
-        move = ai.get_best_move(self.game)
+
+        # Search on a worker thread against a snapshot of the board,
+        # then poll for the result so the UI keeps redrawing.
+        self._ai_busy = True
+        fut = self._executor.submit(ai.get_best_move, self.game.clone())
+        self._pending_ai = (fut, current_player, time.time(), self._ai_generation)
+        self.root.after(30, self._poll_ai_result)
+
+    def _poll_ai_result(self):
+        pending = self._pending_ai
+        if pending is None:
+            return
+        fut, current_player, start, gen = pending
+        if gen != self._ai_generation:
+            # Search started against a game that has since been reset;
+            # drop the stale move instead of applying it to the new board
+            self._ai_busy = False
+            self._pending_ai = None
+            return
+        if not fut.done():
+            self.root.after(30, self._poll_ai_result)
+            return
+
+        self._ai_busy = False
+        self._pending_ai = None
+        move = fut.result()
         dur = time.time() - start
-        
+        ai = self.ai_players.get(current_player)
+
         if move:
             r, c = move
             self.game.make_move(r, c, current_player)
-            self._draw_board()
+            self._redraw_stones()
             self.update_captures()
-            
+
             p_name = "Black" if current_player == BLACK else "White"
             info = (f"{p_name} AI | Time: {dur:.2f}s | "
                     f"Nodes: {ai.nodes_explored} | "
                     f"Pruned: {ai.pruned_branches}")
-            self.info_label.config(text=info)
-            
+            self._set_label(self.info_label, info)
+
             if self.game.winner:
                 self.end_game(f"AI ({p_name}) Wins!")
                 return
-                
+
             # If next player is also AI (AI vs AI), schedule next move
-            next_player = 3 - current_player
+            next_player = OPPONENT[current_player]
             if self.ai_players.get(next_player):
                 self.update_status(f"AI ({'Black' if next_player == BLACK else 'White'}) Turn...")
                 self.root.after(500, self.make_ai_move)
@@ -215,10 +362,25 @@ class PenteGUI:
                 self.update_status("Your Turn (White)")
 
     def update_status(self, msg):
-        self.status_label.config(text=msg)
+        self._set_label(self.status_label, msg)
 
     def update_captures(self):
-        self.capture_label.config(text=f"Captures - White: {self.game.captures[WHITE]} | Black: {self.game.captures[BLACK]}")
+        self._set_label(self.capture_label,
+                        f"Captures - White: {self.game.captures[WHITE]} | Black: {self.game.captures[BLACK]}")
+
+    def _set_label(self, label, text):
+        # Defer .config calls so several updates in one ply coalesce into a
+        # single relayout when the event loop goes idle
+        self._pending_labels[label] = text
+        if not self._flush_pending:
+            self._flush_pending = True
+            self.root.after_idle(self._flush_labels)
+
+    def _flush_labels(self):
+        self._flush_pending = False
+        pending, self._pending_labels = self._pending_labels, {}
+        for label, text in pending.items():
+            label.config(text=text)
 
     def end_game(self, result):
         self.game_over = True
@@ -226,52 +388,105 @@ class PenteGUI:
         messagebox.showinfo("Game Over", result)
 
     def run_and_show_comparison(self):
+        # The analysis takes seconds; run it on a daemon thread and poll a
+        # queue so the window keeps redrawing in the meantime.
         self.update_status("Running quick analysis and showing comparison...")
-        self.root.update()
+        self.compare_btn.config(state='disabled')
+        self._agg_queue = queue.Queue()
+        threading.Thread(target=self._run_agg_worker, daemon=True).start()
+        self.root.after(100, self._check_agg_queue)
+
+    def _run_agg_worker(self):
         try:
-            # Run aggregated analysis
             run_aggregated("gui")
-            # Immediately show the latest aggregated table
+            self._agg_queue.put(("done", None))
+        except Exception as e:
+            self._agg_queue.put(("error", e))
+
+    def _check_agg_queue(self):
+        try:
+            status, err = self._agg_queue.get_nowait()
+        except queue.Empty:
+            self.root.after(100, self._check_agg_queue)
+            return
+
+        self.compare_btn.config(state='normal')
+        if status == "done":
+            self._last_agg_path = None  # force a rescan for the fresh file
             self.show_aggregated_table()
             self.update_status("Comparison ready.")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to run/show comparison: {e}")
+        else:
+            messagebox.showerror("Error", f"Failed to run/show comparison: {err}")
             self.update_status("Comparison failed.")
 
+    def _latest_aggregated_path(self):
+        # Single O(N) scandir pass tracking max mtime; cached until the next
+        # comparison run invalidates it
+        if self._last_agg_path and os.path.exists(self._last_agg_path):
+            return self._last_agg_path
+        latest, latest_mtime = None, -1.0
+        with os.scandir("results") as it:
+            for entry in it:
+                if entry.name.endswith('.csv') and 'aggregated' in entry.name:
+                    mtime = entry.stat().st_mtime
+                    if mtime > latest_mtime:
+                        latest, latest_mtime = entry.path, mtime
+        self._last_agg_path = latest
+        return latest
+
     def show_aggregated_table(self):
         # Look for latest aggregated csv and display in a table
         try:
             os.makedirs("results", exist_ok=True)
-            files = [f for f in os.listdir("results") if f.endswith('.csv') and 'aggregated' in f]
-            if not files:
+            latest = self._latest_aggregated_path()
+            if not latest:
                 messagebox.showinfo("No Aggregated Results", "Run 'Run & Compare (Quick)' first.")
                 return
-            files.sort(reverse=True)
-            latest = os.path.join("results", files[0])
 
-            # Read CSV
-            rows = []
-            with open(latest, 'r', encoding='utf-8') as f:
+            cols = ['position', 'player', 'heuristic', 'mm_time_sum', 'ab_time_sum', 'time_delta', 'speedup', 'mm_nodes_sum', 'ab_nodes_sum', 'nodes_delta', 'nodes_reduction_pct']
+
+            # Read CSV: single typed pass with pandas when available, tuple
+            # rows so insertion below is positional instead of dict-keyed
+            if PANDAS_AVAILABLE:
+                df = pd.read_csv(latest, usecols=cols, dtype=str).fillna('')
+                rows = list(df[cols].itertuples(index=False, name=None))
+            else:
                 import csv as _csv
-                reader = _csv.DictReader(f)
-                for row in reader:
-                    rows.append(row)
+                with open(latest, 'r', encoding='utf-8') as f:
+                    reader = _csv.DictReader(f)
+                    rows = [tuple(r.get(c, '') for c in cols) for r in reader]
 
             # Build window with table
             win = tk.Toplevel(self.root)
             win.title(f"Aggregated Comparison: {os.path.basename(latest)}")
-            cols = ['position', 'player', 'heuristic', 'mm_time_sum', 'ab_time_sum', 'time_delta', 'speedup', 'mm_nodes_sum', 'ab_nodes_sum', 'nodes_delta', 'nodes_reduction_pct']
             tree = ttk.Treeview(win, columns=cols, show='headings')
             for c in cols:
                 tree.heading(c, text=c)
                 width = 120 if c in ('position','player','heuristic') else 130
                 tree.column(c, width=width, anchor='center')
-            for r in rows:
-                tree.insert('', 'end', values=[r.get(c, '') for c in cols])
+            # Populate before packing so the widget lays out once, and page
+            # large result sets instead of inserting thousands of rows up front
+            PAGE = 200
+            insert = tree.insert
+            for values in rows[:PAGE]:
+                insert('', 'end', values=values)
             tree.pack(fill='both', expand=True)
 
             # Add note
             tk.Label(win, text="Aggregated sums comparing Minimax vs Alpha-Beta within the same heuristic (depth=2).\nLower time/nodes is better.").pack(pady=6)
+
+            if len(rows) > PAGE:
+                shown = [PAGE]
+
+                def load_more():
+                    for values in rows[shown[0]:shown[0] + PAGE]:
+                        insert('', 'end', values=values)
+                    shown[0] += PAGE
+                    if shown[0] >= len(rows):
+                        more_btn.destroy()
+
+                more_btn = tk.Button(win, text=f"Load more ({len(rows)} rows total)", command=load_more)
+                more_btn.pack(pady=4)
         except Exception as e:
             messagebox.showerror("Error", f"Failed to show comparison: {e}")
 
@@ -1,144 +1,338 @@
-import math
+import os
 import random
 import time
+from concurrent.futures import ProcessPoolExecutor
 from typing import Tuple, List, Optional
-from game_logic import BOARD_SIZE, EMPTY, WHITE, BLACK
 
-WIN_SCORE       = 10000000
-OPEN_FOUR       = 100000
-CLOSED_FOUR     = 50000 
-OPEN_THREE      = 10000
-CLOSED_THREE    = 1000 
-OPEN_TWO        = 100
-CAPTURE_SCORE   = 50000 
+import numpy as np
+
+from game_logic import BOARD_SIZE, EMPTY, WHITE, BLACK, OPPONENT
+from ai_kernels import (eval_patterns, evaluate_position, warmup,
+                        WIN_SCORE, OPEN_FOUR, CLOSED_FOUR, OPEN_THREE,
+                        CLOSED_THREE, OPEN_TWO, CAPTURE_SCORE)
+
+# Integer search bounds: keeping alpha/beta and scores in int arithmetic
+# avoids float boxing and keeps JIT traces monomorphic (PyPy-friendly too)
+_INF  = 10 ** 12
+_NINF = -_INF
+
+# Transposition table bound types
+TT_EXACT        = 0
+TT_LOWER        = 1
+TT_UPPER        = 2
+
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the per-move time budget runs out."""
+
+
+# Maximum extension depth for the quiescence search at alpha-beta leaves
+_QUIESCENCE_DEPTH = 4
+
+# Full-scan pattern scores are memoized by position hash, salted per player
+# so both colors share one dict. Cleared wholesale when it outgrows the cap.
+_pattern_salt_rng = random.Random(1)
+_PATTERN_SALT = {WHITE: _pattern_salt_rng.getrandbits(64),
+                 BLACK: _pattern_salt_rng.getrandbits(64)}
+_PATTERN_CACHE_MAX = 200_000
+
+
+_DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+
+def _run_score(length, open_start, open_end):
+    if length >= 5:
+        return WIN_SCORE
+    if length == 4:
+        if open_start and open_end: return OPEN_FOUR
+        if open_start or open_end: return CLOSED_FOUR
+    elif length == 3:
+        if open_start and open_end: return OPEN_THREE
+        if open_start or open_end: return CLOSED_THREE
+    elif length == 2:
+        if open_start and open_end: return OPEN_TWO
+    return 0
+
+
+def _score_line(grid, cells, player):
+    """Pattern score of one maximal board line (a precomputed cell list).
+
+    Scores whole maximal runs, which matches the per-run-start accounting
+    in eval_patterns, so summed line scores can stand in for full scans.
+    """
+    score = 0
+    run = 0
+    open_start = False
+    prev = -1  # off-board sentinel
+    for r, c in cells:
+        cell = grid[r, c]
+        if cell == player:
+            if run == 0:
+                open_start = prev == EMPTY
+            run += 1
+        elif run:
+            score += _run_score(run, open_start, cell == EMPTY)
+            run = 0
+        prev = cell
+    if run:
+        score += _run_score(run, open_start, False)
+    return score
+
+
+def _build_lines_through():
+    """For every cell, the four maximal lines through it: (line id, cells).
+
+    Walking a precomputed cell list needs no bounds checks and no rewind to
+    the line start, and the id lets callers dedupe shared lines.
+    """
+    table = []
+    for r in range(BOARD_SIZE):
+        for c in range(BOARD_SIZE):
+            entries = []
+            for di in range(4):
+                dr, dc = _DIRECTIONS[di]
+                rr, cc = r, c
+                while 0 <= rr - dr < BOARD_SIZE and 0 <= cc - dc < BOARD_SIZE:
+                    rr -= dr
+                    cc -= dc
+                cells = []
+                while 0 <= rr < BOARD_SIZE and 0 <= cc < BOARD_SIZE:
+                    cells.append((rr, cc))
+                    rr += dr
+                    cc += dc
+                flat = np.array([rr * BOARD_SIZE + cc for rr, cc in cells],
+                                dtype=np.intp)
+                entries.append(((di, cells[0][0], cells[0][1]), tuple(cells), flat))
+            table.append(tuple(entries))
+    return table
+
+
+_LINES_THROUGH = _build_lines_through()
+
+# Shape -> score table for _lines_score: a line's raw cell bytes map to its
+# (white, black) pattern scores. Filled lazily; the same few thousand line
+# shapes recur constantly during search, so rescoring becomes a dict hit.
+_LINE_SCORE_TABLE: dict = {}
+_LINE_SCORE_TABLE_MAX = 1 << 20
+
+
+def _eval_root_child(board, move, depth, mode, player_color, time_limit,
+                     alpha=_NINF):
+    """Process-pool worker: score one root move with its own PenteAI.
+
+    `alpha` is the score of the eldest root brother, searched serially
+    before the pool fans out, so every worker starts with a real bound
+    instead of a full window.
+    """
+    ai = PenteAI(mode=mode, player_color=player_color, depth=depth,
+                 time_limit=time_limit)
+    ai.start_time = time.time()
+    ai._pscore = {WHITE: ai._evaluate_patterns(board, WHITE),
+                  BLACK: ai._evaluate_patterns(board, BLACK)}
+    ai._pscore_stack = []
+    h_func = ai.heuristic_1 if mode.endswith('h1') else ai.heuristic_2
+    r, c = move
+    ai._apply_move(board, r, c, player_color)
+    try:
+        score = -ai._negamax(board, depth - 1, _NINF, -alpha,
+                             OPPONENT[player_color], h_func)
+    except SearchTimeout:
+        return None
+    return score, move, ai.nodes_explored
+
 
 class PenteAI:
-    def __init__(self, mode: str = 'alphabeta_h2', player_color: int = BLACK, depth: int = 2):
+    def __init__(self, mode: str = 'alphabeta_h2', player_color: int = BLACK, depth: int = 2,
+                 tt: Optional[dict] = None, time_limit: float = 5.0, ordering: bool = True,
+                 proximity: bool = True, workers: int = 1):
         self.mode = mode
         self.player_color = player_color
         self.opponent_color = 3 - player_color
         self.depth = depth
+        self.ordering = ordering
+        self.proximity = proximity
         self.nodes_explored = 0
         self.pruned_branches = 0
         self.start_time = 0
-        self.time_limit = 5.0 
+        self.time_limit = time_limit
+        # Transposition table: key -> (depth, flag, score, best_move).
+        # Can be shared between AI instances and persists across moves; the
+        # tag keeps entries scored by a different engine or heuristic from
+        # colliding with ours (one shared tuple, so keys stay 3-wide).
+        self.tt = {} if tt is None else tt
+        self._tt_tag = (player_color, mode)
+        # Killer moves: two quiet moves per remaining depth that caused a
+        # beta cutoff, tried right after the TT move.
+        self.killers = {}
+        # History heuristic: cumulative depth^2 credit for cutoff moves,
+        # used as an ordering tiebreaker across the whole tree.
+        self.history = {}
+        # Incremental pattern scores per player, valid while a search runs.
+        # _apply_move/_unapply_move keep them in sync so leaf evaluation
+        # reads two stored numbers instead of rescanning the board.
+        self._pscore = None
+        self._pscore_stack = []
+        # Moves currently applied by the running search, so a timeout can
+        # unwind them and hand the caller's board back unchanged
+        self._move_path = []
+        # Memo of full-board pattern scans, keyed by salted zobrist hash
+        self._pattern_cache = {}
+        # Root parallelism: with workers > 1, alpha-beta root children are
+        # scored in separate processes (lazily created, reused across moves)
+        self.workers = workers
+        self._pool = None
+        warmup()
+
+    def reset_stats(self):
+        self.nodes_explored = 0
+        self.pruned_branches = 0
+        self.start_time = 0
+
+    def clear_tt(self):
+        self.tt.clear()
 
     def get_best_move(self, board) -> Tuple[int, int]:
         self.nodes_explored = 0
         self.pruned_branches = 0
+        self.killers.clear()
+        self.history.clear()
         self.start_time = time.time()
 
-        forced_move = self._find_immediate_forced_move(board)
-        if forced_move:
-            print(f"AI found forced move: {forced_move}")
-            return forced_move
+        self._pscore = {WHITE: self._evaluate_patterns(board, WHITE),
+                        BLACK: self._evaluate_patterns(board, BLACK)}
+        self._pscore_stack = []
+        self._move_path = []
+
+        # Iterative deepening: search depth 1, 2, ... committing the last
+        # depth that completed within the time budget. Completed iterations
+        # also seed the transposition table, improving the deeper passes.
+        best_move = None
+        for d in range(1, self.depth + 1):
+            try:
+                move = self._search_at_depth(board, d)
+            except SearchTimeout:
+                # The timeout propagated out mid-line: undo whatever the
+                # interrupted search left on the board
+                while self._move_path:
+                    r, c = self._move_path[-1]
+                    self._unapply_move(board, r, c)
+                break
+            if move is not None:
+                best_move = move
+            if time.time() - self.start_time >= self.time_limit:
+                break
+        return best_move
 
+    def _search_at_depth(self, board, depth: int) -> Optional[Tuple[int, int]]:
+        if self.workers > 1 and self.mode.startswith('alphabeta') and board.move_count > 0:
+            return self._parallel_root(board, depth)
         if self.mode == 'minimax_h1':
-            return self.minimax_h1(board, self.depth)
+            return self.minimax_h1(board, depth)
         elif self.mode == 'minimax_h2':
-            return self.minimax_h2(board, self.depth)
+            return self.minimax_h2(board, depth)
         elif self.mode == 'alphabeta_h1':
-            return self.alphabeta_h1(board, self.depth)
-        elif self.mode == 'alphabeta_h2':
-            return self.alphabeta_h2(board, self.depth)
+            return self.alphabeta_h1(board, depth)
         else:
-            return self.alphabeta_h2(board, self.depth)
+            return self.alphabeta_h2(board, depth)
+
+    def _parallel_root(self, board, depth: int) -> Optional[Tuple[int, int]]:
+        """Score root children across a process pool and pick the argmax.
+
+        Young-brothers-wait root parallelization: the eldest (best-ordered)
+        child is searched serially first to establish alpha, then the rest
+        fan out across the pool with that bound, trading the shared TT for
+        GIL-free CPU use across cores.
+        """
+        candidates = self._get_smart_candidates(board)
+        if not candidates:
+            return None
+        if self.ordering:
+            candidates = self._order_moves(board, candidates, self.player_color)
+        if len(candidates) == 1:
+            return candidates[0]
+
+        # Eldest brother first, in-process: its score seeds every worker's
+        # alpha, so off-PV siblings cut early instead of opening full windows
+        player = self.player_color
+        best_move = candidates[0]
+        r, c = best_move
+        self._apply_move(board, r, c, player)
+        if board.winner == player:
+            self._unapply_move(board, r, c)
+            return best_move
+        best_score = -self._negamax(board, depth - 1, _NINF, _INF,
+                                    self.opponent_color, self.heuristic_1
+                                    if self.mode.endswith('h1') else self.heuristic_2)
+        self._unapply_move(board, r, c)
+
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=min(os.cpu_count() or 1, self.workers))
+        remaining = self.time_limit - (time.time() - self.start_time)
+        futures = [self._pool.submit(_eval_root_child, board.clone(), move, depth,
+                                     self.mode, self.player_color, remaining,
+                                     best_score)
+                   for move in candidates[1:]]
+        for future in futures:
+            result = future.result()
+            if result is None:  # that worker ran out of budget
+                continue
+            score, move, nodes = result
+            self.nodes_explored += nodes
+            if score > best_score:
+                best_score = score
+                best_move = move
+        return best_move
 
     def heuristic_1(self, board, player: int) -> int:
         score = 0
-        opponent = 3 - player
+        opponent = OPPONENT[player]
         score += (board.captures[player] - board.captures[opponent]) * CAPTURE_SCORE
-        my_patterns  = self._evaluate_patterns(board, player)
-        opp_patterns = self._evaluate_patterns(board, opponent)
-        score += my_patterns * 1.5 
-        score -= opp_patterns * 0.8
+        if self._pscore is not None:
+            my_patterns  = self._pscore[player]
+            opp_patterns = self._pscore[opponent]
+        else:
+            my_patterns  = self._evaluate_patterns(board, player)
+            opp_patterns = self._evaluate_patterns(board, opponent)
+        score += my_patterns * 3 // 2
+        score -= opp_patterns * 4 // 5
         return score
 
     def heuristic_2(self, board, player: int) -> int:
-        score = 0
-        opponent = 3 - player
-        center = BOARD_SIZE // 2
+        opponent = OPPONENT[player]
 
         if board.winner == player:
             return WIN_SCORE
         if board.winner == opponent:
             return -WIN_SCORE
 
-        score += (board.captures[player] - board.captures[opponent]) * (CAPTURE_SCORE // 2)
+        # A four-pair capture lead is one capture from winning; saturate on
+        # the capture term alone and skip the positional/pattern work.
+        cap_diff = board.captures[player] - board.captures[opponent]
+        if cap_diff >= 4 or cap_diff <= -4:
+            return cap_diff * CAPTURE_SCORE
 
-        for r in range(BOARD_SIZE):
-            for c in range(BOARD_SIZE):
-                if board.grid[r][c] == player:
-                    dist = abs(r - center) + abs(c - center)
-                    score += (20 - dist) 
+        if self._pscore is not None:
+            score = (board.captures[player] - board.captures[opponent]) * (CAPTURE_SCORE // 2)
+            score += board.center_bonus[player]
+            return score + self._pscore[player] - self._pscore[opponent] * 6 // 5
 
-        my_patterns = self._evaluate_patterns(board, player)
-        opp_patterns = self._evaluate_patterns(board, opponent)
-
-        score += my_patterns * 1.0
-        score -= opp_patterns * 1.2 
-
-        return score
+        return evaluate_position(board.grid, player, opponent,
+                                 board.captures[player], board.captures[opponent])
 
     def _evaluate_patterns(self, board, player: int) -> int:
-        score = 0
-        opponent = 3 - player
-        directions = [(0, 1), (1, 0), (1, 1), (1, -1)]
-
-        for r in range(BOARD_SIZE):
-            for c in range(BOARD_SIZE):
-                if board.grid[r][c] == player:
-                    for dr, dc in directions:
-                        prev_r, prev_c = r - dr, c - dc
-                        if 0 <= prev_r < BOARD_SIZE and 0 <= prev_c < BOARD_SIZE and board.grid[prev_r][prev_c] == player:
-                            continue
-                        score += self._score_sequence(board, r, c, dr, dc, player, opponent)
+        # Memoized wrapper over the JIT-compiled scanner (no-op decorated
+        # plain Python when numba is unavailable).
+        cache = self._pattern_cache
+        key = board.zobrist ^ _PATTERN_SALT[player]
+        score = cache.get(key)
+        if score is None:
+            score = eval_patterns(board.grid, player, OPPONENT[player])
+            if len(cache) >= _PATTERN_CACHE_MAX:
+                cache.clear()
+            cache[key] = score
         return score
 
-    def _score_sequence(self, board, r, c, dr, dc, player, opponent) -> int:
-        length = 0
-        gaps = 0
-        
-        for i in range(5):
-            nr, nc = r + dr*i, c + dc*i
-            if not (0 <= nr < BOARD_SIZE and 0 <= nc < BOARD_SIZE):
-                break 
-            
-            cell = board.grid[nr][nc]
-            if cell == player:
-                length += 1
-            elif cell == EMPTY:
-                gaps += 1 
-                break 
-            else: 
-                break
-
-        open_start = False
-        pr, pc = r - dr, c - dc
-        if 0 <= pr < BOARD_SIZE and 0 <= pc < BOARD_SIZE and board.grid[pr][pc] == EMPTY:
-            open_start = True
-
-        open_end = False
-        er, ec = r + dr*length, c + dc*length
-        if 0 <= er < BOARD_SIZE and 0 <= ec < BOARD_SIZE and board.grid[er][ec] == EMPTY:
-            open_end = True
-
-        if length == 5:
-            return WIN_SCORE 
-        
-        if length == 4:
-            if open_start and open_end: return OPEN_FOUR
-            if open_start or open_end: return CLOSED_FOUR
-        
-        if length == 3:
-            if open_start and open_end: return OPEN_THREE
-            if open_start or open_end: return CLOSED_THREE
-
-        if length == 2:
-            if open_start and open_end: return OPEN_TWO
-
-        return 0
-
     def minimax_h1(self, board, depth: int) -> Tuple[int, int]:
         _, move = self._minimax_recursive(board, depth, True, self.heuristic_1)
         return move
@@ -149,7 +343,9 @@ class PenteAI:
 
     def _minimax_recursive(self, board, depth, maximizing, h_func):
         self.nodes_explored += 1
-        
+        if self.nodes_explored % 256 == 0 and time.time() - self.start_time > self.time_limit:
+            raise SearchTimeout()
+
         winner = board.winner
         if winner == self.player_color: return WIN_SCORE, None
         if winner == self.opponent_color: return -WIN_SCORE, None
@@ -161,117 +357,368 @@ class PenteAI:
             return 0, None
 
         best_move = candidates[0]
+        apply_move, unapply_move = self._apply_move, self._unapply_move
+        recurse = self._minimax_recursive
 
         if maximizing:
-            max_eval = -math.inf
+            max_eval = _NINF
+            player = self.player_color
             for r, c in candidates:
-                board.make_move(r, c, self.player_color)
-                eval_val, _ = self._minimax_recursive(board, depth-1, False, h_func)
-                board.undo_move(r, c)
+                apply_move(board, r, c, player)
+                eval_val, _ = recurse(board, depth-1, False, h_func)
+                unapply_move(board, r, c)
                 if eval_val > max_eval:
                     max_eval = eval_val
                     best_move = (r, c)
             return max_eval, best_move
         else:
-            min_eval = math.inf
+            min_eval = _INF
+            opponent = self.opponent_color
             for r, c in candidates:
-                board.make_move(r, c, self.opponent_color)
-                eval_val, _ = self._minimax_recursive(board, depth-1, True, h_func)
-                board.undo_move(r, c)
+                apply_move(board, r, c, opponent)
+                eval_val, _ = recurse(board, depth-1, True, h_func)
+                unapply_move(board, r, c)
                 if eval_val < min_eval:
                     min_eval = eval_val
                     best_move = (r, c)
             return min_eval, best_move
 
     def alphabeta_h1(self, board, depth: int) -> Tuple[int, int]:
-        _, move = self._alphabeta_recursive(board, depth, -math.inf, math.inf, True, self.heuristic_1)
-        return move
+        return self._ab_root(board, depth, self.heuristic_1)
 
     def alphabeta_h2(self, board, depth: int) -> Tuple[int, int]:
-        _, move = self._alphabeta_recursive(board, depth, -math.inf, math.inf, True, self.heuristic_2)
-        return move
+        return self._ab_root(board, depth, self.heuristic_2)
+
+    def _ab_root(self, board, depth, h_func) -> Optional[Tuple[int, int]]:
+        """Root driver: tracks the best move; subtrees return bare scores."""
+        candidates = self._get_smart_candidates(board)
+        if not candidates:
+            return None
 
-    def _alphabeta_recursive(self, board, depth, alpha, beta, maximizing, h_func):
+        tt_key = (board.zobrist, self.player_color, self._tt_tag)
+        entry = self.tt.get(tt_key)
+        if self.ordering:
+            tt_move = entry[3] if entry is not None else None
+            candidates = self._order_moves(board, candidates, self.player_color,
+                                           tt_move, self.killers.get(depth))
+
+        best_move = candidates[0]
+        alpha = _NINF
+        player = self.player_color
+        opponent = self.opponent_color
+        first = True
+        for r, c in candidates:
+            self._apply_move(board, r, c, player)
+            if board.winner == player:
+                # Immediate win (five or fifth capture pair): no point
+                # scoring the remaining root moves, play it
+                self._unapply_move(board, r, c)
+                self._tt_store(tt_key, depth, WIN_SCORE, (r, c), _NINF, _INF)
+                return (r, c)
+            if first:
+                val = -self._negamax(board, depth - 1, _NINF, -alpha, opponent, h_func)
+                first = False
+            else:
+                val = -self._negamax(board, depth - 1, -alpha-1, -alpha, opponent, h_func)
+                if val > alpha:
+                    val = -self._negamax(board, depth - 1, _NINF, -val, opponent, h_func)
+            self._unapply_move(board, r, c)
+            if val > alpha:
+                alpha = val
+                best_move = (r, c)
+        self._tt_store(tt_key, depth, alpha, best_move, _NINF, _INF)
+        return best_move
+
+    def _negamax(self, board, depth, alpha, beta, side, h_func):
+        """Negamax alpha-beta for internal nodes, returning just the score.
+
+        Values are from `side`'s perspective and every child is searched
+        through one `-recurse(-beta, -alpha)` call site, so there is a
+        single loop body instead of mirrored max/min branches. Best moves
+        are still tracked for the TT, but the hot return path hands back a
+        bare number: no (score, move) tuple per node.
+        """
         self.nodes_explored += 1
-        
+        if self.nodes_explored % 256 == 0 and time.time() - self.start_time > self.time_limit:
+            raise SearchTimeout()
+
         winner = board.winner
-        if winner == self.player_color: return WIN_SCORE, None
-        if winner == self.opponent_color: return -WIN_SCORE, None
+        if winner is not None:
+            return WIN_SCORE if winner == side else -WIN_SCORE
         if depth == 0:
-            return h_func(board, self.player_color), None
+            return self._quiescence(board, alpha, beta, side, h_func,
+                                    _QUIESCENCE_DEPTH)
+
+        # Scores are from side-to-move's perspective, and the key carries
+        # the owning engine and heuristic when the table is shared between
+        # AIs. Captures are already folded into the hash by the board.
+        tt_key = (board.zobrist, side, self._tt_tag)
+        entry = self.tt.get(tt_key)
+        if entry is not None and entry[0] >= depth:
+            _, flag, score, tt_move = entry
+            if flag == TT_EXACT:
+                return score
+            # Bound entries that don't cut off outright still tighten the
+            # window, so later siblings prune earlier.
+            if flag == TT_LOWER:
+                if score >= beta:
+                    return score
+                alpha = max(alpha, score)
+            elif flag == TT_UPPER:
+                if score <= alpha:
+                    return score
+                beta = min(beta, score)
+
+        alpha_orig, beta_orig = alpha, beta
 
         candidates = self._get_smart_candidates(board)
         if not candidates:
-            return 0, None
+            return 0
+
+        if self.ordering:
+            tt_move = entry[3] if entry is not None else None
+            candidates = self._order_moves(board, candidates, side, tt_move,
+                                           self.killers.get(depth))
 
         best_move = candidates[0]
+        apply_move, unapply_move = self._apply_move, self._unapply_move
+        recurse = self._negamax
+        opponent = OPPONENT[side]
+
+        # PVS: full window for the first (best-ordered) child, a zero-width
+        # probe for the rest, re-searched only on a fail-high inside the window
+        best = _NINF
+        first = True
+        for r, c in candidates:
+            apply_move(board, r, c, side)
+            if first:
+                val = -recurse(board, depth-1, -beta, -alpha, opponent, h_func)
+                first = False
+            else:
+                val = -recurse(board, depth-1, -alpha-1, -alpha, opponent, h_func)
+                if alpha < val < beta:
+                    val = -recurse(board, depth-1, -beta, -val, opponent, h_func)
+            unapply_move(board, r, c)
+
+            if val > best:
+                best = val
+                best_move = (r, c)
+
+            if val > alpha:
+                alpha = val
+            if alpha >= beta:
+                self.pruned_branches += 1
+                self._record_killer(depth, (r, c))
+                break
+        self._tt_store(tt_key, depth, best, best_move, alpha_orig, beta_orig)
+        return best
 
-        if maximizing:
-            max_eval = -math.inf
-            for r, c in candidates:
-                board.make_move(r, c, self.player_color)
-                eval_val, _ = self._alphabeta_recursive(board, depth-1, alpha, beta, False, h_func)
-                board.undo_move(r, c)
-                
-                if eval_val > max_eval:
-                    max_eval = eval_val
-                    best_move = (r, c)
-                
-                alpha = max(alpha, eval_val)
-                if beta <= alpha:
-                    self.pruned_branches += 1
-                    break
-            return max_eval, best_move
+    def _quiescence(self, board, alpha, beta, side, h_func, qdepth):
+        """Resolve forcing lines (wins, blocks, captures) past the horizon.
+
+        Returning a static value from a position with a hanging four or
+        pending capture misjudges it; extending only noisy moves keeps the
+        cost bounded while fixing those leaves. Negamax form, like the
+        main recursion: values are from `side`'s perspective.
+        """
+        self.nodes_explored += 1
+        if self.nodes_explored % 256 == 0 and time.time() - self.start_time > self.time_limit:
+            raise SearchTimeout()
+
+        winner = board.winner
+        if winner is not None:
+            return WIN_SCORE if winner == side else -WIN_SCORE
+
+        stand_pat = h_func(board, self.player_color)
+        if side != self.player_color:
+            stand_pat = -stand_pat
+        if qdepth == 0 or stand_pat >= beta:
+            return stand_pat
+        if stand_pat > alpha:
+            alpha = stand_pat
+
+        best = stand_pat
+        opponent = OPPONENT[side]
+        for r, c in self._noisy_moves(board, side):
+            self._apply_move(board, r, c, side)
+            val = -self._quiescence(board, -beta, -alpha, opponent, h_func, qdepth - 1)
+            self._unapply_move(board, r, c)
+            if val > best:
+                best = val
+            if val > alpha:
+                alpha = val
+            if alpha >= beta:
+                break
+        return best
+
+    def _noisy_moves(self, board, player) -> List[Tuple[int, int]]:
+        """Moves worth extending: immediate fives, blocks of fives, captures."""
+        opponent = OPPONENT[player]
+        grid = board.grid
+        noisy = []
+        for r, c in board.candidate_set:
+            if (self._max_run_if_placed(board, r, c, player) >= 5
+                    or self._max_run_if_placed(board, r, c, opponent) >= 5
+                    or self._would_capture(grid, r, c, player, opponent)):
+                noisy.append((r, c))
+        return noisy
+
+    @staticmethod
+    def _would_capture(grid, r, c, player, opponent) -> bool:
+        for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1),
+                       (0, -1), (-1, 0), (-1, -1), (-1, 1)):
+            r3, c3 = r + 3 * dr, c + 3 * dc
+            if (0 <= r3 < BOARD_SIZE and 0 <= c3 < BOARD_SIZE
+                    and grid[r3, c3] == player
+                    and grid[r + dr, c + dc] == opponent
+                    and grid[r + 2 * dr, c + 2 * dc] == opponent):
+                return True
+        return False
+
+    def _tt_store(self, key, depth, score, best_move, alpha_orig, beta_orig):
+        if score <= alpha_orig:
+            flag = TT_UPPER
+        elif score >= beta_orig:
+            flag = TT_LOWER
         else:
-            min_eval = math.inf
-            for r, c in candidates:
-                board.make_move(r, c, self.opponent_color)
-                eval_val, _ = self._alphabeta_recursive(board, depth-1, alpha, beta, True, h_func)
-                board.undo_move(r, c)
-                
-                if eval_val < min_eval:
-                    min_eval = eval_val
-                    best_move = (r, c)
-                
-                beta = min(beta, eval_val)
-                if beta <= alpha:
-                    self.pruned_branches += 1
-                    break
-            return min_eval, best_move
+            flag = TT_EXACT
+        self.tt[key] = (depth, flag, score, best_move)
+
+    def _apply_move(self, board, r, c, player):
+        """make_move plus an incremental update of the pattern scores.
+
+        A move only changes runs on the lines through the placed stone and
+        through any captured stones, so those lines are rescored before and
+        after instead of rescanning the whole board.
+        """
+        opponent = OPPONENT[player]
+        grid = board.grid
+        cells = [(r, c)]
+        for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1),
+                       (0, -1), (-1, 0), (-1, -1), (-1, 1)):
+            r3, c3 = r + 3 * dr, c + 3 * dc
+            if (0 <= r3 < BOARD_SIZE and 0 <= c3 < BOARD_SIZE
+                    and grid[r3, c3] == player
+                    and grid[r + dr, c + dc] == opponent
+                    and grid[r + 2 * dr, c + 2 * dc] == opponent):
+                cells.append((r + dr, c + dc))
+                cells.append((r + 2 * dr, c + 2 * dc))
+
+        before_w, before_b = self._lines_score(board, cells)
+        board.make_move(r, c, player)
+        after_w, after_b = self._lines_score(board, cells)
+
+        pscore = self._pscore
+        self._pscore_stack.append((pscore[WHITE], pscore[BLACK]))
+        pscore[WHITE] += after_w - before_w
+        pscore[BLACK] += after_b - before_b
+        self._move_path.append((r, c))
+
+    def _unapply_move(self, board, r, c):
+        board.undo_move(r, c)
+        pscore = self._pscore
+        pscore[WHITE], pscore[BLACK] = self._pscore_stack.pop()
+        self._move_path.pop()
+
+    def _lines_score(self, board, cells):
+        """Summed pattern scores of the maximal lines through cells (deduped)."""
+        grid = board.grid
+        flat_grid = grid.ravel()
+        table = _LINE_SCORE_TABLE
+        seen = set()
+        white = black = 0
+        for r, c in cells:
+            for key, line, flat in _LINES_THROUGH[r * BOARD_SIZE + c]:
+                if key in seen:
+                    continue
+                seen.add(key)
+                shape = flat_grid[flat].tobytes()
+                scores = table.get(shape)
+                if scores is None:
+                    scores = (_score_line(grid, line, WHITE),
+                              _score_line(grid, line, BLACK))
+                    if len(table) >= _LINE_SCORE_TABLE_MAX:
+                        table.clear()
+                    table[shape] = scores
+                white += scores[0]
+                black += scores[1]
+        return white, black
+
+    def _record_killer(self, depth, move):
+        self.history[move] = self.history.get(move, 0) + depth * depth
+        slots = self.killers.get(depth)
+        if slots is None:
+            self.killers[depth] = [move, None]
+        elif move != slots[0]:
+            slots[1] = slots[0]
+            slots[0] = move
+
+    def _order_moves(self, board, candidates, player, tt_move=None,
+                     killers=None) -> List[Tuple[int, int]]:
+        """Cheap static ordering: TT move, killers, threats, then centrality.
+
+        Good ordering is what lets alpha-beta approach its sqrt(b) effective
+        branching factor, so this runs before every expansion.
+        """
+        opponent = OPPONENT[player]
+        center = BOARD_SIZE // 2
+        neighbor_count = board.neighbor_count
+        history = self.history
+        scored = []
+        for r, c in candidates:
+            if (r, c) == tt_move:
+                score = WIN_SCORE
+            else:
+                my_run = self._max_run_if_placed(board, r, c, player)
+                opp_run = self._max_run_if_placed(board, r, c, opponent)
+                score = 0
+                if my_run >= 5:
+                    score += OPEN_FOUR * 10
+                elif my_run == 4:
+                    score += OPEN_FOUR
+                # Blocking an imminent five outranks extending our own
+                # non-winning four; only an outright win beats it
+                if opp_run >= 5:
+                    score += OPEN_FOUR * 5
+                elif opp_run == 4:
+                    score += CLOSED_FOUR
+                elif opp_run == 3:
+                    score += OPEN_THREE
+                if killers and (r, c) in killers:
+                    score += OPEN_THREE * 5
+                score += history.get((r, c), 0)
+                # Prefer busy neighborhoods (maintained count, no window scan)
+                score += neighbor_count[r * BOARD_SIZE + c] * 4
+                score -= max(abs(r - center), abs(c - center))
+            scored.append((score, (r, c)))
+        scored.sort(reverse=True)
+        return [move for _, move in scored]
+
+    def _max_run_if_placed(self, board, r, c, player) -> int:
+        """Longest contiguous run through (r, c) if player played there."""
+        best = 0
+        for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1)):
+            count = 1
+            nr, nc = r + dr, c + dc
+            while 0 <= nr < BOARD_SIZE and 0 <= nc < BOARD_SIZE and board.grid[nr, nc] == player:
+                count += 1
+                nr, nc = nr + dr, nc + dc
+            nr, nc = r - dr, c - dc
+            while 0 <= nr < BOARD_SIZE and 0 <= nc < BOARD_SIZE and board.grid[nr, nc] == player:
+                count += 1
+                nr, nc = nr - dr, nc - dc
+            if count > best:
+                best = count
+        return best
 
     def _get_smart_candidates(self, board) -> List[Tuple[int, int]]:
         if board.move_count == 0:
             return [(BOARD_SIZE // 2, BOARD_SIZE // 2)]
-        
-        candidates = set()
-        rad = 2
-        
-        for r in range(BOARD_SIZE):
-            for c in range(BOARD_SIZE):
-                if board.grid[r][c] != EMPTY:
-                    for dr in range(-rad, rad+1):
-                        for dc in range(-rad, rad+1):
-                            nr, nc = r + dr, c + dc
-                            if 0 <= nr < BOARD_SIZE and 0 <= nc < BOARD_SIZE and board.grid[nr][nc] == EMPTY:
-                                candidates.add((nr, nc))
-        return list(candidates)
-
-    def _find_immediate_forced_move(self, board) -> Optional[Tuple[int, int]]:
-        candidates = self._get_smart_candidates(board)
-        opponent = self.opponent_color
 
-        for r, c in candidates:
-            board.make_move(r, c, self.player_color)
-            if board.winner == self.player_color:
-                board.undo_move(r, c)
-                return (r, c)
-            board.undo_move(r, c)
-            
-        for r, c in candidates:
-            board.make_move(r, c, opponent)
-            if board.winner == opponent:
-                board.undo_move(r, c)
-                return (r, c)
-            board.undo_move(r, c)
+        if not self.proximity:
+            rs, cs = np.nonzero(board.grid == EMPTY)
+            return list(zip(rs.tolist(), cs.tolist()))
 
-        return None
\ No newline at end of file
+        # The board maintains the candidate set move by move, so generation
+        # is just a copy of the stored set.
+        return list(board.candidate_set)
@@ -0,0 +1,126 @@
+"""Numba-compiled evaluation kernels for the Pente AI.
+
+Everything here is a module-level function over the raw int8 board array so
+numba can compile it; when numba is not installed the njit decorator below
+degrades to a no-op and the kernels run as plain Python.
+"""
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        # No-op decorator so the kernels below still run as plain Python
+        if args and callable(args[0]):
+            return args[0]
+
+        def decorator(func):
+            return func
+        return decorator
+
+from game_logic import BOARD_SIZE, EMPTY, WHITE, BLACK
+
+# Pattern scores (shared source of truth; ai_engine re-exports these)
+WIN_SCORE       = 10000000
+OPEN_FOUR       = 100000
+CLOSED_FOUR     = 50000
+OPEN_THREE      = 10000
+CLOSED_THREE    = 1000
+OPEN_TWO        = 100
+CAPTURE_SCORE   = 50000
+
+
+def _build_line_starts():
+    """(direction index, r, c) of the first cell of every maximal line."""
+    dirs = ((0, 1), (1, 0), (1, 1), (1, -1))
+    starts = []
+    for di, (dr, dc) in enumerate(dirs):
+        for r in range(BOARD_SIZE):
+            for c in range(BOARD_SIZE):
+                pr, pc = r - dr, c - dc
+                if not (0 <= pr < BOARD_SIZE and 0 <= pc < BOARD_SIZE):
+                    starts.append((di, r, c))
+    return np.array(starts, dtype=np.int64)
+
+
+_LINE_STARTS = _build_line_starts()
+_DIR_ARR = np.array(((0, 1), (1, 0), (1, 1), (1, -1)), dtype=np.int64)
+
+
+@njit(cache=True)
+def eval_patterns(grid, player, opponent):
+    """Pattern scan over the whole int8 grid, JIT-compiled when numba is
+    available. Walks every maximal line exactly once from its precomputed
+    start, tokenizing runs, instead of probing run starts per cell."""
+    score = 0
+    for i in range(_LINE_STARTS.shape[0]):
+        di = _LINE_STARTS[i, 0]
+        r = _LINE_STARTS[i, 1]
+        c = _LINE_STARTS[i, 2]
+        dr = _DIR_ARR[di, 0]
+        dc = _DIR_ARR[di, 1]
+        run = 0
+        open_start = False
+        prev = -1  # off-board sentinel
+        while 0 <= r < BOARD_SIZE and 0 <= c < BOARD_SIZE:
+            cell = grid[r, c]
+            if cell == player:
+                if run == 0:
+                    open_start = prev == EMPTY
+                run += 1
+            elif run:
+                open_end = cell == EMPTY
+                if run >= 5:
+                    score += WIN_SCORE
+                elif run == 4:
+                    if open_start and open_end:
+                        score += OPEN_FOUR
+                    elif open_start or open_end:
+                        score += CLOSED_FOUR
+                elif run == 3:
+                    if open_start and open_end:
+                        score += OPEN_THREE
+                    elif open_start or open_end:
+                        score += CLOSED_THREE
+                elif run == 2:
+                    if open_start and open_end:
+                        score += OPEN_TWO
+                run = 0
+            prev = cell
+            r += dr
+            c += dc
+        if run >= 5:
+            score += WIN_SCORE
+        elif run == 4 and open_start:
+            score += CLOSED_FOUR
+        elif run == 3 and open_start:
+            score += CLOSED_THREE
+    return score
+
+
+@njit(cache=True)
+def evaluate_position(grid, player, opponent, my_caps, opp_caps):
+    """Full H2 leaf evaluation (captures, center control, patterns)."""
+    score = (my_caps - opp_caps) * (CAPTURE_SCORE // 2)
+    center = BOARD_SIZE // 2
+    for r in range(BOARD_SIZE):
+        for c in range(BOARD_SIZE):
+            if grid[r, c] == player:
+                score += 20 - abs(r - center) - abs(c - center)
+    my_patterns = eval_patterns(grid, player, opponent)
+    opp_patterns = eval_patterns(grid, opponent, player)
+    return score + my_patterns - opp_patterns * 6 // 5
+
+
+_warmed_up = False
+
+
+def warmup():
+    """Trigger JIT compilation once, off the hot path."""
+    global _warmed_up
+    if not _warmed_up:
+        evaluate_position(np.zeros((BOARD_SIZE, BOARD_SIZE), dtype=np.int8), WHITE, BLACK, 0, 0)
+        _warmed_up = True
@@ -118,13 +118,9 @@ def run_experiments(tag: str = "default") -> List[Dict[str, Any]]:
         base_game = pos_fn()
         for player in (BLACK, WHITE):
             for mode, depth in MODES:
-                # Fresh copy
-                g = PenteGame()
-                for r in range(len(base_game.grid)):
-                    for c in range(len(base_game.grid[r])):
-                        cell = base_game.grid[r][c]
-                        if cell != 0:
-                            g.make_move(r, c, cell)
+                # Fresh copy (clone copies all incremental state, so no
+                # replay with capture/winner checks per stone)
+                g = base_game.clone()
                 res = run_one(mode, depth, g, player)
                 res["position"] = pos_name
                 all_results.append(res)
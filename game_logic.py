@@ -1,24 +1,98 @@
+import random
 from typing import List, Tuple, Optional
 
+import numpy as np
+
+try:
+    from scipy.ndimage import binary_dilation
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
 # Constants
 BOARD_SIZE = 19
 EMPTY = 0
 WHITE = 1  # Player 1 (Starts)
 BLACK = 2  # Player 2
+OPPONENT = {WHITE: BLACK, BLACK: WHITE}
+
+# Zobrist keys for incremental position hashing (index [r][c][player]).
+# Seeded so hashes are reproducible across runs.
+_zobrist_rng = random.Random(0)
+ZOBRIST = [[[_zobrist_rng.getrandbits(64) for _ in range(3)]
+            for _ in range(BOARD_SIZE)]
+           for _ in range(BOARD_SIZE)]
+# Capture counts are folded into the hash too (indexed [player][count]), so
+# positions that differ only in captures never collide and TT keys stay small.
+ZOBRIST_CAPS = [[_zobrist_rng.getrandbits(64) for _ in range(32)]
+                for _ in range(3)]
+
+
+# Positional weight of each cell (20 - manhattan distance from center),
+# tabulated as plain ints so the running sums below stay int arithmetic
+CENTER_BONUS = [[20 - abs(r - BOARD_SIZE // 2) - abs(c - BOARD_SIZE // 2)
+                 for c in range(BOARD_SIZE)] for r in range(BOARD_SIZE)]
+
+# Bitboards use a padded row stride: bit r * _BB_STRIDE + c, with one always
+# empty bit between rows so shifted runs can never wrap across an edge.
+_BB_STRIDE = BOARD_SIZE + 1
+_BB_DIRS = (1, _BB_STRIDE, _BB_STRIDE + 1, _BB_STRIDE - 1)
+
+
+def _bb_has_five(bb: int) -> bool:
+    for d in _BB_DIRS:
+        x = bb & (bb >> d)
+        x &= x >> (2 * d)
+        if x & (bb >> (4 * d)):
+            return True
+    return False
+
+
+def _build_neighbor_masks():
+    """Bitboard mask of the 8 cells around each cell, for adjacency tests."""
+    masks = []
+    for r in range(BOARD_SIZE):
+        for c in range(BOARD_SIZE):
+            m = 0
+            for dr in (-1, 0, 1):
+                for dc in (-1, 0, 1):
+                    rr, cc = r + dr, c + dc
+                    if (dr or dc) and 0 <= rr < BOARD_SIZE and 0 <= cc < BOARD_SIZE:
+                        m |= 1 << (rr * _BB_STRIDE + cc)
+            masks.append(m)
+    return masks
+
+
+_NEIGHBOR_MASK = _build_neighbor_masks()
 
 class PenteGame:
     def __init__(self, tournament_rule: bool = False):
-        self.grid = [[EMPTY for _ in range(BOARD_SIZE)] for _ in range(BOARD_SIZE)]
+        self.grid = np.zeros((BOARD_SIZE, BOARD_SIZE), dtype=np.int8)
         self.move_count = 0
         self.captures = {WHITE: 0, BLACK: 0} 
-        self.capture_history = [] 
+        # Per-move capture bookkeeping: a bool per move, with details pushed
+        # on capture_history only for the rare moves that actually capture
+        self.capture_history = []
+        self.move_had_capture = []
         self.tournament_rule = tournament_rule 
         self.last_move = None
         self.winner = None
         self.winning_sequence = []
+        self.turn = WHITE  # side to move
+        self.zobrist = 0
+        # One big-int bitboard per color (index by player constant)
+        self.bb = [0, 0, 0]
+        # Per-cell count of stones within radius 2, kept incrementally so
+        # candidate generation is a mask test instead of a window scan.
+        self.neighbor_count = bytearray(BOARD_SIZE * BOARD_SIZE)
+        # Empty cells within radius 2 of a stone, maintained alongside
+        # neighbor_count so the AI can use it as its move list directly.
+        self.candidate_set = set()
+        # Running sum of CENTER_BONUS over each player's stones
+        self.center_bonus = {WHITE: 0, BLACK: 0}
 
     def is_valid_move(self, row: int, col: int, player: int) -> bool:
-        if not (0 <= row < BOARD_SIZE and 0 <= col < BOARD_SIZE and self.grid[row][col] == EMPTY):
+        if not (0 <= row < BOARD_SIZE and 0 <= col < BOARD_SIZE and self.grid[row, col] == EMPTY):
             return False
 
         if self.tournament_rule and self.move_count == 2: 
@@ -27,50 +101,85 @@ class PenteGame:
 
     def make_move(self, row: int, col: int, player: int) -> bool:
         if self.is_valid_move(row, col, player):
-            self.grid[row][col] = player
+            self.grid[row, col] = player
+            self.center_bonus[player] += CENTER_BONUS[row][col]
+            self.bb[player] |= 1 << (row * _BB_STRIDE + col)
+            self.zobrist ^= ZOBRIST[row][col][player]
+            self._bump_neighbors(row, col, 1)
             self.last_move = (row, col)
             self.move_count += 1
             
+            self.turn = OPPONENT[player]
             self.check_and_capture(row, col, player)
             self.update_winner(player)
             return True
         return False
 
     def undo_move(self, row: int, col: int):
-        self.grid[row][col] = EMPTY
+        self.turn = int(self.grid[row, col])  # the undone stone's owner moves again
+        self.center_bonus[self.turn] -= CENTER_BONUS[row][col]
+        self.bb[self.turn] &= ~(1 << (row * _BB_STRIDE + col))
+        self.zobrist ^= ZOBRIST[row][col][self.grid[row, col]]
+        self.grid[row, col] = EMPTY
+        self._bump_neighbors(row, col, -1)
         self.move_count -= 1
         self.winner = None
         self.winning_sequence = []
-        
-        if self.capture_history:
-            capture_info = self.capture_history.pop()
-            if capture_info:
-                opponent = capture_info['opponent']
-                for r, c in capture_info['stones']:
-                    self.grid[r][c] = opponent
-                self.captures[capture_info['player']] -= capture_info['count']
+
+        if self.move_had_capture and self.move_had_capture.pop():
+            capturer, opponent, count, stones = self.capture_history.pop()
+            for r, c in stones:
+                self.grid[r, c] = opponent
+                self.center_bonus[opponent] += CENTER_BONUS[r][c]
+                self.bb[opponent] |= 1 << (r * _BB_STRIDE + c)
+                self.zobrist ^= ZOBRIST[r][c][opponent]
+                self._bump_neighbors(r, c, 1)
+            old_count = self.captures[capturer]
+            self.captures[capturer] = old_count - count
+            self.zobrist ^= (ZOBRIST_CAPS[capturer][old_count]
+                             ^ ZOBRIST_CAPS[capturer][old_count - count])
 
     def get_candidate_moves(self, radius: int = 2) -> List[Tuple[int, int]]:
         if self.move_count == 0:
             return [(BOARD_SIZE // 2, BOARD_SIZE // 2)]
-        
-        candidates = set()
+
+        # The default radius matches the incrementally maintained set, so no
+        # scan is needed at all for the common case
+        if radius == 2:
+            return list(self.candidate_set)
+
+        # Other radii: one C-level dilation of the occupancy mask when scipy
+        # is around, else a flat bitmap dedupe without tuple hashing
+        if SCIPY_AVAILABLE:
+            occupied = self.grid != EMPTY
+            near = binary_dilation(occupied,
+                                   structure=np.ones((3, 3), dtype=bool),
+                                   iterations=radius)
+            rs, cs = np.nonzero(near & ~occupied)
+            return list(zip(rs.tolist(), cs.tolist()))
+
+        seen = bytearray(BOARD_SIZE * BOARD_SIZE)
+        candidates = []
         for r in range(BOARD_SIZE):
             for c in range(BOARD_SIZE):
-                if self.grid[r][c] != EMPTY:
-                    for dr in range(-radius, radius + 1):
-                        for dc in range(-radius, radius + 1):
-                            nr, nc = r + dr, c + dc
-                            if (0 <= nr < BOARD_SIZE and 
-                                0 <= nc < BOARD_SIZE and 
-                                self.grid[nr][nc] == EMPTY):
-                                candidates.add((nr, nc))
-        return list(candidates)
+                if self.grid[r, c] != EMPTY:
+                    for nr in range(max(0, r - radius), min(BOARD_SIZE, r + radius + 1)):
+                        base = nr * BOARD_SIZE
+                        for nc in range(max(0, c - radius), min(BOARD_SIZE, c + radius + 1)):
+                            if not seen[base + nc] and self.grid[nr, nc] == EMPTY:
+                                seen[base + nc] = 1
+                                candidates.append((nr, nc))
+        return candidates
 
     def check_and_capture(self, r: int, c: int, player: int):
-        opponent        = 3 - player 
+        opponent        = 3 - player
+        # A capture needs an opponent stone adjacent to the placed one, so
+        # one bitboard AND rules out most moves before the direction loop
+        if not self.bb[opponent] & _NEIGHBOR_MASK[r * BOARD_SIZE + c]:
+            self.move_had_capture.append(False)
+            return
         captured_count  = 0
-        captured_stones = [] 
+        captured_stones = None  # allocated only if a capture fires
         directions      = [(0, 1), (1, 0), (1, 1), (1, -1)] 
         
         for dr, dc in directions:
@@ -78,13 +187,21 @@ class PenteGame:
             r2, c2 = r + 2 * dr, c + 2 * dc
             r3, c3 = r + 3 * dr, c + 3 * dc
             
-            if self._is_on_board(r3, c3):
-                if (self.grid[r1][c1] == opponent and 
-                    self.grid[r2][c2] == opponent and 
-                    self.grid[r3][c3] == player):
+            if 0 <= r3 < BOARD_SIZE and 0 <= c3 < BOARD_SIZE:
+                if (self.grid[r1, c1] == opponent and 
+                    self.grid[r2, c2] == opponent and 
+                    self.grid[r3, c3] == player):
                     
-                    self.grid[r1][c1] = EMPTY
-                    self.grid[r2][c2] = EMPTY
+                    self.grid[r1, c1] = EMPTY
+                    self.grid[r2, c2] = EMPTY
+                    self.center_bonus[opponent] -= CENTER_BONUS[r1][c1] + CENTER_BONUS[r2][c2]
+                    self.bb[opponent] &= ~((1 << (r1 * _BB_STRIDE + c1)) |
+                                           (1 << (r2 * _BB_STRIDE + c2)))
+                    self.zobrist ^= ZOBRIST[r1][c1][opponent] ^ ZOBRIST[r2][c2][opponent]
+                    self._bump_neighbors(r1, c1, -1)
+                    self._bump_neighbors(r2, c2, -1)
+                    if captured_stones is None:
+                        captured_stones = []
                     captured_stones.append((r1, c1))
                     captured_stones.append((r2, c2))
                     captured_count += 1
@@ -93,52 +210,101 @@ class PenteGame:
             r2, c2 = r - 2 * dr, c - 2 * dc
             r3, c3 = r - 3 * dr, c - 3 * dc
             
-            if self._is_on_board(r3, c3):
-                if (self.grid[r1][c1] == opponent and 
-                    self.grid[r2][c2] == opponent and 
-                    self.grid[r3][c3] == player):
+            if 0 <= r3 < BOARD_SIZE and 0 <= c3 < BOARD_SIZE:
+                if (self.grid[r1, c1] == opponent and 
+                    self.grid[r2, c2] == opponent and 
+                    self.grid[r3, c3] == player):
                     
-                    self.grid[r1][c1] = EMPTY
-                    self.grid[r2][c2] = EMPTY
+                    self.grid[r1, c1] = EMPTY
+                    self.grid[r2, c2] = EMPTY
+                    self.center_bonus[opponent] -= CENTER_BONUS[r1][c1] + CENTER_BONUS[r2][c2]
+                    self.bb[opponent] &= ~((1 << (r1 * _BB_STRIDE + c1)) |
+                                           (1 << (r2 * _BB_STRIDE + c2)))
+                    self.zobrist ^= ZOBRIST[r1][c1][opponent] ^ ZOBRIST[r2][c2][opponent]
+                    self._bump_neighbors(r1, c1, -1)
+                    self._bump_neighbors(r2, c2, -1)
+                    if captured_stones is None:
+                        captured_stones = []
                     captured_stones.append((r1, c1))
                     captured_stones.append((r2, c2))
                     captured_count += 1
         
         if captured_count > 0:
-            self.captures[player] += captured_count
-            self.capture_history.append({
-                'player'        : player,
-                'opponent'      : opponent,
-                'count'         : captured_count,
-                'stones'        : captured_stones
-            })
+            old_count = self.captures[player]
+            self.captures[player] = old_count + captured_count
+            self.zobrist ^= (ZOBRIST_CAPS[player][old_count]
+                             ^ ZOBRIST_CAPS[player][old_count + captured_count])
+            self.capture_history.append((player, opponent, captured_count,
+                                         captured_stones))
+            self.move_had_capture.append(True)
         else:
-            self.capture_history.append(None)
+            self.move_had_capture.append(False)
 
     def _is_on_board(self, r, c):
         return 0 <= r < BOARD_SIZE and 0 <= c < BOARD_SIZE
 
+    def _bump_neighbors(self, r: int, c: int, delta: int):
+        counts = self.neighbor_count
+        candidates = self.candidate_set
+        grid = self.grid
+        for nr in range(max(0, r - 2), min(BOARD_SIZE, r + 3)):
+            base = nr * BOARD_SIZE
+            for nc in range(max(0, c - 2), min(BOARD_SIZE, c + 3)):
+                idx = base + nc
+                counts[idx] += delta
+                # Membership follows from count and occupancy, so the same
+                # update works for both making and undoing a move.
+                if counts[idx] and grid[nr, nc] == EMPTY:
+                    candidates.add((nr, nc))
+                else:
+                    candidates.discard((nr, nc))
+
     def update_winner(self, player):
-        if self.captures[player] >= 5: 
+        if self.captures[player] >= 5:
             self.winner = player
             return
-        directions = [(0, 1), (1, 0), (1, 1), (1, -1)]
-        for r in range(BOARD_SIZE):
-            for c in range(BOARD_SIZE):
-                if self.grid[r][c] == player:
-                    for dr, dc in directions:
-                        sequence = [(r, c)]
-                        for i in range(1, 5):
-                            nr, nc = r + dr * i, c + dc * i
-                            if self._is_on_board(nr, nc) and self.grid[nr][nc] == player:
-                                sequence.append((nr, nc))
-                            else:
-                                break
-                        
-                        if len(sequence) >= 5:
-                            self.winner = player
-                            self.winning_sequence = sequence
-                            return
+        # Shift/AND bitboard test first: ~16 big-int ops answer "is there a
+        # five anywhere" before the local walk runs to locate it
+        if not _bb_has_five(self.bb[player]):
+            return
+        # A new five must pass through the stone just played, so walk the
+        # four lines through last_move instead of rescanning the board
+        row, col = self.last_move
+        grid = self.grid
+        for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1)):
+            r, c = row - dr, col - dc
+            while 0 <= r < BOARD_SIZE and 0 <= c < BOARD_SIZE and grid[r, c] == player:
+                r -= dr
+                c -= dc
+            r += dr
+            c += dc
+            cells = []
+            while 0 <= r < BOARD_SIZE and 0 <= c < BOARD_SIZE and grid[r, c] == player:
+                cells.append((r, c))
+                r += dr
+                c += dc
+            if len(cells) >= 5:
+                self.winner = player
+                self.winning_sequence = cells[:5]
+                return
+
+    def clone(self) -> 'PenteGame':
+        copy = PenteGame(self.tournament_rule)
+        copy.grid = self.grid.copy()
+        copy.bb = list(self.bb)
+        copy.center_bonus = dict(self.center_bonus)
+        copy.neighbor_count = bytearray(self.neighbor_count)
+        copy.candidate_set = set(self.candidate_set)
+        copy.move_count = self.move_count
+        copy.captures = dict(self.captures)
+        copy.capture_history = list(self.capture_history)
+        copy.move_had_capture = list(self.move_had_capture)
+        copy.last_move = self.last_move
+        copy.turn = self.turn
+        copy.zobrist = self.zobrist
+        copy.winner = self.winner
+        copy.winning_sequence = list(self.winning_sequence)
+        return copy
 
     def is_full(self):
         return self.move_count >= BOARD_SIZE * BOARD_SIZE